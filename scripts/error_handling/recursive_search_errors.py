@@ -3,13 +3,69 @@ This script recursively searches through a specified directory for .txt files to
 If any of the predefined error messages are found within a .txt file, the script moves both the .txt file and its 
 corresponding .jpg file (assumed to have the same name, differing only in file extension) to a 'redo_error' directory. 
 This 'redo_error' directory is created within the starting directory if it does not already exist. The script provides 
-updates on its progress, including the number of files processed, the number of files moved due to errors, and a list of 
+updates on its progress, including the number of files processed, the number of files moved due to errors, and the number of 
 files that were checked but did not contain any of the specified errors. This is useful for managing and correcting files 
 that failed automated processing due to these specific errors.
 """
 
 import os
-import shutil
+import re
+import concurrent.futures
+
+# Define the error messages to search for
+ERROR_MESSAGES = [
+    "Error Connecting: HTTPSConnectionPool",
+    "OOps: Something Else: HTTPSConnectionPool",
+    "I'm sorry, I can't provide assistance with that request.",
+    "HTTP Error: 400 Client Error: Bad Request for url: https://api.openai.com/v1/chat/completions"
+]
+
+# Match any of the error messages in a single pass over the raw file contents
+ERROR_PATTERN = re.compile(b"|".join(re.escape(message.encode()) for message in ERROR_MESSAGES))
+
+# The error messages replace the whole caption, so only the start of each file needs to be scanned
+SCAN_BYTES = 8192
+
+# Number of files read concurrently; the reads are I/O-bound and release the GIL
+MAX_WORKERS = 32
+
+def find_txt_files(start_path, skip_path):
+    """
+    Recursively find all .txt files in the starting directory, skipping one directory.
+
+    Parameters:
+    - start_path (str): The directory path to start searching for .txt files.
+    - skip_path (str): The directory path to leave out of the search.
+
+    Returns:
+    generator: A generator yielding the paths to the .txt files.
+    """
+    # Walk the tree with os.scandir so the extension filter runs on the directory entries
+    # returned by the kernel, without an extra stat call per file
+    folders = [start_path]
+    while folders:
+        foldername = folders.pop()
+        with os.scandir(foldername) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path != skip_path:
+                        folders.append(entry.path)
+                elif entry.name.endswith(".txt"):
+                    yield entry.path
+
+def has_error(file_path):
+    """
+    Check whether a .txt file contains one of the error messages.
+
+    Parameters:
+    - file_path (str): The path to the .txt file.
+
+    Returns:
+    bool: True if an error message was found, False otherwise.
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(SCAN_BYTES)
+    return ERROR_PATTERN.search(head) is not None
 
 def check_and_move_files(start_path):
     """
@@ -21,57 +77,46 @@ def check_and_move_files(start_path):
     Returns:
     None
     """
-    # Define the error messages to search for
-    error_messages = [
-        "Error Connecting: HTTPSConnectionPool",
-        "OOps: Something Else: HTTPSConnectionPool",
-        "I'm sorry, I can't provide assistance with that request.",
-        "HTTP Error: 400 Client Error: Bad Request for url: https://api.openai.com/v1/chat/completions"
-    ]
-    
     # Setup 'redo_error' directory within 'start_path'
     redo_error_path = os.path.join(start_path, 'redo_error')
-    if not os.path.exists(redo_error_path):
-        os.makedirs(redo_error_path)
+    os.makedirs(redo_error_path, exist_ok=True)
     
     # Counters for files processed and moved
     files_processed = 0
     files_moved = 0
-    files_with_no_error = []
-
-    # Walk through the directory structure
-    for root, dirs, files in os.walk(start_path):
-        for file in files:
-            if file.endswith(".txt"):
-                files_processed += 1
-                file_path = os.path.join(root, file)
-                with open(file_path, 'r') as f:
-                    contents = f.read()
-                    if any(error_message in contents for error_message in error_messages):
-                        jpg_file_path = os.path.splitext(file_path)[0] + '.jpg'
-                        new_txt_path = os.path.join(redo_error_path, os.path.basename(file_path))
-                        new_jpg_path = os.path.join(redo_error_path, os.path.basename(jpg_file_path))
-                        
-                        # Move the .txt file
-                        shutil.move(file_path, new_txt_path)
-                        
-                        # Move the corresponding .jpg file if it exists
-                        if os.path.exists(jpg_file_path):
-                            shutil.move(jpg_file_path, new_jpg_path)
-                        files_moved += 1
-                        print(f"Error found and moved: {file} and corresponding .jpg")
-                    else:
-                        files_with_no_error.append(file)
+    files_with_no_error = 0
+
+    # Walk through the directory structure, leaving out files already moved to 'redo_error'
+    txt_files = list(find_txt_files(start_path, redo_error_path))
+
+    # Read the files concurrently; the moves and counters stay in this thread
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = zip(txt_files, executor.map(has_error, txt_files))
+        for file_path, error_found in results:
+            files_processed += 1
+            file = os.path.basename(file_path)
+            if error_found:
+                jpg_file_path = os.path.splitext(file_path)[0] + '.jpg'
+                new_txt_path = os.path.join(redo_error_path, file)
+                new_jpg_path = os.path.join(redo_error_path, os.path.basename(jpg_file_path))
+
+                # Move the .txt file; 'redo_error' is on the same filesystem, so a rename is enough
+                os.replace(file_path, new_txt_path)
+
+                # Move the corresponding .jpg file if it exists
+                try:
+                    os.replace(jpg_file_path, new_jpg_path)
+                except FileNotFoundError:
+                    pass
+                files_moved += 1
+                print(f"Error found and moved: {file} and corresponding .jpg")
+            else:
+                files_with_no_error += 1
 
     # Summary of actions
     print(f"Total files processed: {files_processed}")
     print(f"Total files moved due to errors: {files_moved}")
-    if files_with_no_error:
-        print("Files with no specified errors:")
-        for file in files_with_no_error:
-            print(f"- {file}")
-    else:
-        print("No files without specified errors.")
+    print(f"Files with no specified errors: {files_with_no_error}")
 
 # Replace 'your_start_directory_path_here' with the path to the directory where you want to start processing
 check_and_move_files('/PATH/fix')
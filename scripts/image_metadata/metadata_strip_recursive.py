@@ -16,12 +16,26 @@ Example:
 """
 
 import concurrent.futures
+import contextlib
 import os
+import sys
 from PIL import Image
-import piexif
+from PIL.PngImagePlugin import PngInfo
 
 Image.MAX_IMAGE_PIXELS = None
 
+# Lowercased image extensions to look for
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg'})
+
+# Number of images handed to a worker process at a time
+CHUNKSIZE = 16
+
+def init_worker():
+    """
+    Load the Pillow image plugins once when a worker process starts, instead of on its first image.
+    """
+    Image.init()
+
 def remove_metadata(file_path):
     """
     Remove metadata from the image file.
@@ -30,22 +44,33 @@ def remove_metadata(file_path):
     - file_path (str): The path to the image file.
 
     Returns:
-    None
+    str: A message describing the result, printed by the main process.
     """
+    # Temporary file the new image is written to before it replaces the original
+    temp_path = file_path + '.tmp'
     try:
-        image = Image.open(file_path)
-        if "exif" in image.info:
-            del image.info["exif"]
-        clean_image = Image.new(image.mode, image.size)
-        clean_image.putdata(image.getdata())
-        
-        # Preserve the original file format (PNG, JPG, or JPEG) when saving
-        file_format = file_path.split('.')[-1].upper()
-        
-        clean_image.save(file_path, format=file_format, exif=piexif.dump({}))
-        print(f"Removed metadata from {file_path}")
+        with Image.open(file_path) as image:
+            image.load()
+            # Dropping the metadata is enough, the pixel data can be saved as is
+            image.info.clear()
+
+            # Write to a temporary file first so a crash never leaves a half-written image behind,
+            # preserving the original file format (PNG or JPEG)
+            if image.format == "PNG":
+                image.save(temp_path, format="PNG", pnginfo=PngInfo())
+            elif image.format == "JPEG":
+                # Reuse the original quantization tables so the image is not degraded
+                image.save(temp_path, format="JPEG", exif=b"", quality="keep")
+            else:
+                image.save(temp_path, format=image.format)
+        os.replace(temp_path, file_path)
+        return f"Removed metadata from {file_path}"
     except Exception as e:
-        print(f"Failed to process {file_path}: {e}")
+        return f"Failed to process {file_path}: {e}"
+    finally:
+        # os.replace has already moved the temporary file on success; anything left is a partial write
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
 
 def find_image_files(base_folder):
     """
@@ -57,23 +82,26 @@ def find_image_files(base_folder):
     Returns:
     generator: A generator yielding the paths to the image files.
     """
-    for foldername, _, filenames in os.walk(base_folder):
-        for filename in filenames:
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                yield os.path.join(foldername, filename)
+    # Walk the tree with os.scandir so the extension filter runs on the directory entries
+    # returned by the kernel, without an extra stat call per file
+    folders = [base_folder]
+    while folders:
+        foldername = folders.pop()
+        with os.scandir(foldername) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.name[entry.name.rfind('.'):].lower() in IMAGE_EXTENSIONS:
+                    yield entry.path
 
 if __name__ == "__main__":
     folder_path = input("Enter the base folder path: ")
     max_workers = int(input("Enter the maximum number of workers: "))
 
-    image_files = list(find_image_files(folder_path))
-
-    if not image_files:
-        print("No image files found in the folder.")
-    else:
-        print(f"Processing {len(image_files)} images...")
-
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        executor.map(remove_metadata, image_files)
+    # Stream the paths to the workers while the folder is still being walked, and report
+    # the results from the main process instead of printing from every worker
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as executor:
+        results = executor.map(remove_metadata, find_image_files(folder_path), chunksize=CHUNKSIZE)
+        sys.stdout.writelines(f"{message}\n" for message in results)
 
     print("Processing complete.")
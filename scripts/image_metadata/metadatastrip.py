@@ -16,13 +16,24 @@ Example:
 """
 
 import concurrent.futures
+import contextlib
 import os
+import sys
 from PIL import Image
-import piexif
+from PIL.PngImagePlugin import PngInfo
 
 # To prevent issues with extremely large images
 Image.MAX_IMAGE_PIXELS = None
 
+# Number of images handed to a worker process at a time
+CHUNKSIZE = 16
+
+def init_worker():
+    """
+    Load the Pillow image plugins once when a worker process starts, instead of on its first image.
+    """
+    Image.init()
+
 def remove_metadata(file_path):
     """
     Remove metadata from the image file.
@@ -31,18 +42,26 @@ def remove_metadata(file_path):
     - file_path (str): The path to the image file.
 
     Returns:
-    None
+    str: A message describing the result, printed by the main process.
     """
+    # Temporary file the new image is written to before it replaces the original
+    temp_path = file_path + '.tmp'
     try:
-        image = Image.open(file_path)
-        if "exif" in image.info:
-            del image.info["exif"]
-        clean_image = Image.new(image.mode, image.size)
-        clean_image.putdata(image.getdata())
-        clean_image.save(file_path, format="PNG", exif=piexif.dump({}))
-        print(f"Removed metadata from {file_path}")
+        with Image.open(file_path) as image:
+            image.load()
+            # Dropping the metadata is enough, the pixel data can be saved as is
+            image.info.clear()
+
+            # Write to a temporary file first so a crash never leaves a half-written image behind
+            image.save(temp_path, format="PNG", pnginfo=PngInfo())
+        os.replace(temp_path, file_path)
+        return f"Removed metadata from {file_path}"
     except Exception as e:
-        print(f"Failed to process {file_path}: {e}")
+        return f"Failed to process {file_path}: {e}"
+    finally:
+        # os.replace has already moved the temporary file on success; anything left is a partial write
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
 
 if __name__ == "__main__":
     # Get user inputs
@@ -51,15 +70,16 @@ if __name__ == "__main__":
 
     # List all files in the folder and filter out the PNG files
     files = os.listdir(folder_path)
-    png_files = [file for file in files if file.lower().endswith(".png")]
+    png_files = [file for file in files if file[file.rfind('.'):].lower() == ".png"]
 
     if not png_files:
         print("No PNG files found in the folder.")
     else:
         print(f"Processing {len(png_files)} PNG images...")
 
-    # Process the files concurrently
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        executor.map(remove_metadata, [os.path.join(folder_path, file_name) for file_name in png_files])
+    # Process the files concurrently and report the results from the main process
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as executor:
+        results = executor.map(remove_metadata, [os.path.join(folder_path, file_name) for file_name in png_files], chunksize=CHUNKSIZE)
+        sys.stdout.writelines(f"{message}\n" for message in results)
 
     print("Processing complete.")
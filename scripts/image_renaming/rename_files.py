@@ -16,6 +16,12 @@ Example:
 """
 
 import os
+import sys
+
+from rename_utils import apply_renames
+
+# Lowercased image extensions to look for
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg'})
 
 def rename_files(folder_path, new_name_prefix):
     """
@@ -29,16 +35,27 @@ def rename_files(folder_path, new_name_prefix):
     None
     """
     files = os.listdir(folder_path)
-    image_files = [file for file in files if file.lower().endswith((".png", ".jpg", ".jpeg"))]
+    image_files = [file for file in files if file[file.rfind('.'):].lower() in IMAGE_EXTENSIONS]
+
+    # The folder part of every path is the same, so join it once
+    folder_prefix = os.path.join(folder_path, '')
 
+    renames = []
+    renamed = []
     for i, file_name in enumerate(image_files, 1):
-        file_extension = os.path.splitext(file_name)[1]
+        file_extension = file_name[file_name.rfind('.'):]
         new_file_name = f"{new_name_prefix}_{i:03}{file_extension}"
-        old_file_path = os.path.join(folder_path, file_name)
-        new_file_path = os.path.join(folder_path, new_file_name)
+        old_file_path = folder_prefix + file_name
+        new_file_path = folder_prefix + new_file_name
+
+        renames.append((old_file_path, new_file_path))
+        renamed.append(f"Renamed {file_name} to {new_file_name}")
+
+    apply_renames(renames)
 
-        os.rename(old_file_path, new_file_path)
-        print(f"Renamed {file_name} to {new_file_name}")
+    # Report all renames in a single write instead of one print per file
+    if renamed:
+        sys.stdout.write("\n".join(renamed) + "\n")
 
 if __name__ == "__main__":
     # Get user inputs
@@ -16,6 +16,9 @@ Example:
 """
 
 import os
+import sys
+
+from rename_utils import apply_renames
 
 def rename_files(folder_path, new_name_prefix):
     """
@@ -29,15 +32,26 @@ def rename_files(folder_path, new_name_prefix):
     None
     """
     files = os.listdir(folder_path)
-    jpg_files = [file for file in files if file.lower().endswith(".jpg")]
+    jpg_files = [file for file in files if file[file.rfind('.'):].lower() == ".jpg"]
+
+    # The folder part of every path is the same, so join it once
+    folder_prefix = os.path.join(folder_path, '')
 
+    renames = []
+    renamed = []
     for i, file_name in enumerate(jpg_files, 1):
         new_file_name = f"{new_name_prefix}_{i:03}.jpg"
-        old_file_path = os.path.join(folder_path, file_name)
-        new_file_path = os.path.join(folder_path, new_file_name)
+        old_file_path = folder_prefix + file_name
+        new_file_path = folder_prefix + new_file_name
+
+        renames.append((old_file_path, new_file_path))
+        renamed.append(f"Renamed {file_name} to {new_file_name}")
+
+    apply_renames(renames)
 
-        os.rename(old_file_path, new_file_path)
-        print(f"Renamed {file_name} to {new_file_name}")
+    # Report all renames in a single write instead of one print per file
+    if renamed:
+        sys.stdout.write("\n".join(renamed) + "\n")
 
 if __name__ == "__main__":
     # Get user inputs
@@ -21,6 +21,8 @@ Example:
 import os
 import pathlib
 
+from rename_utils import apply_renames
+
 def rename_files_in_subfolders(base_folder, new_name_prefix):
     """
     Rename all image files in the specified base folder and its subfolders with a new name prefix, child directory name, and sequential number.
@@ -44,15 +46,18 @@ def rename_files_in_subfolders(base_folder, new_name_prefix):
         image_files_path_obj = [pathlib.Path(os.path.join(foldername, file)) for file in image_files]
         image_files_path_obj.sort(key=lambda x: x.stat().st_mtime)
 
+        renames = []
         for i, file_path_obj in enumerate(image_files_path_obj, 1):
             old_file_name = file_path_obj.name
             file_extension = file_path_obj.suffix  # Get the file extension (.png, .jpg, or .jpeg)
             new_file_name = f"{new_name_prefix}_{child_directory_name}_{i:03}{file_extension}"
             new_file_path = file_path_obj.with_name(new_file_name)
 
-            os.rename(file_path_obj, new_file_path)
+            renames.append((str(file_path_obj), str(new_file_path)))
             print(f"Renamed {old_file_name} to {new_file_name}")
 
+        apply_renames(renames)
+
 if __name__ == "__main__":
     # Get user inputs
     folder_path = input("Enter the base folder path: ")
@@ -19,7 +19,12 @@ Example:
 """
 
 import os
-import pathlib
+import sys
+
+from rename_utils import apply_renames
+
+# Lowercased image extensions to look for
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg'})
 
 def rename_files_in_subfolders(base_folder, new_name_prefix):
     """
@@ -32,25 +37,39 @@ def rename_files_in_subfolders(base_folder, new_name_prefix):
     Returns:
     None
     """
-    for foldername, _, filenames in os.walk(base_folder):
+    renamed = []
+    folders = [base_folder]
+    while folders:
+        foldername = folders.pop()
         # Extract only the name of the child directory from the path
         child_directory_name = os.path.basename(foldername)
-        
-        # Filter out the png, jpg, and jpeg files
-        image_files = [file for file in filenames if file.lower().endswith(('.png', '.jpg', '.jpeg'))]
-        
-        # Use pathlib to get file info and sort by modification time
-        image_files_path_obj = [pathlib.Path(os.path.join(foldername, file)) for file in image_files]
-        image_files_path_obj.sort(key=lambda x: x.stat().st_mtime)
-
-        for i, file_path_obj in enumerate(image_files_path_obj, 1):
-            old_file_name = file_path_obj.name
-            file_extension = file_path_obj.suffix  # Get the file extension (.png, .jpg, or .jpeg)
+
+        # Collect the subfolders and the png, jpg, and jpeg files in a single directory scan
+        image_entries = []
+        with os.scandir(foldername) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.is_file() and entry.name[entry.name.rfind('.'):].lower() in IMAGE_EXTENSIONS:
+                    image_entries.append(entry)
+
+        # Sort by modification time using the stat info cached on each directory entry
+        image_entries.sort(key=lambda entry: entry.stat().st_mtime)
+
+        renames = []
+        for i, entry in enumerate(image_entries, 1):
+            file_extension = os.path.splitext(entry.name)[1]  # Get the file extension (.png, .jpg, or .jpeg)
             new_file_name = f"{new_name_prefix}_{child_directory_name}_{i:03}{file_extension}"
-            new_file_path = file_path_obj.with_name(new_file_name)
+            new_file_path = os.path.join(foldername, new_file_name)
+
+            renames.append((entry.path, new_file_path))
+            renamed.append(f"Renamed {entry.name} to {new_file_name}")
+
+        apply_renames(renames)
 
-            os.rename(file_path_obj, new_file_path)
-            print(f"Renamed {old_file_name} to {new_file_name}")
+    # Report all renames in a single write instead of one print per file
+    if renamed:
+        sys.stdout.write("\n".join(renamed) + "\n")
 
 if __name__ == "__main__":
     # Get user inputs
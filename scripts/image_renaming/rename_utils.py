@@ -0,0 +1,68 @@
+"""
+Helpers shared by the image renaming scripts in this folder.
+
+Functionality:
+1. Applies a batch of (old_path, new_path) renames without overwriting any file in the batch.
+2. Stages files through unused temporary names when new names collide with old ones, and moves
+   them back if staging fails partway.
+
+Usage:
+    Imported by the renaming scripts; it is not meant to be run on its own.
+
+Example:
+    from rename_utils import apply_renames
+"""
+
+import os
+import uuid
+import concurrent.futures
+
+def staging_path(old_path):
+    """
+    Pick a temporary name next to old_path that no existing file is using.
+
+    Parameters:
+    - old_path (str): The path of the file to stage.
+
+    Returns:
+    str: An unused path in the same folder as old_path.
+    """
+    while True:
+        temp_path = f"{old_path}.{uuid.uuid4().hex}.tmp"
+        if not os.path.exists(temp_path):
+            return temp_path
+
+def apply_renames(renames):
+    """
+    Rename files from a list of (old_path, new_path) pairs without overwriting any of them.
+
+    If a new path is still taken by another file in the list, for example when the folder was
+    already renamed by an earlier run, all files are first moved to unused temporary names. The
+    final renames are then independent of each other and are run concurrently.
+
+    Parameters:
+    - renames (list): List of (old_path, new_path) tuples.
+
+    Returns:
+    None
+    """
+    renames = [(old_path, new_path) for old_path, new_path in renames if old_path != new_path]
+    old_paths = {old_path for old_path, _ in renames}
+
+    if any(new_path in old_paths for _, new_path in renames):
+        # Stage every file through a temporary name so no file is overwritten before it has moved
+        staged_renames = []
+        try:
+            for old_path, new_path in renames:
+                temp_path = staging_path(old_path)
+                os.rename(old_path, temp_path)
+                staged_renames.append((temp_path, new_path, old_path))
+        except OSError:
+            # Put the files staged so far back under their original names before giving up
+            for temp_path, _, old_path in reversed(staged_renames):
+                os.rename(temp_path, old_path)
+            raise
+        renames = [(temp_path, new_path) for temp_path, new_path, _ in staged_renames]
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        list(executor.map(lambda rename: os.rename(*rename), renames))
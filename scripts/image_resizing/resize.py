@@ -16,10 +16,24 @@ Example:
     python script.py
 """
 
+import contextlib
 import os
 import concurrent.futures
+from functools import partial
 from PIL import Image
 
+# Number of images handed to a worker process at a time
+CHUNKSIZE = 16
+
+# Lowercased image extensions to look for
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg'})
+
+def init_worker():
+    """
+    Load the Pillow image plugins once when a worker process starts, instead of on its first image.
+    """
+    Image.init()
+
 def resize_image(image_path, new_width, new_height):
     """
     Resize an image to the specified width and height.
@@ -32,13 +46,23 @@ def resize_image(image_path, new_width, new_height):
     Returns:
     None
     """
+    # Temporary file the new image is written to before it replaces the original
+    temp_path = image_path + '.tmp'
     try:
-        img = Image.open(image_path)
-        img = img.resize((new_width, new_height), Image.LANCZOS)
-        img.save(image_path)
+        with Image.open(image_path) as img:
+            image_format = img.format
+            resized_img = img.resize((new_width, new_height), Image.LANCZOS)
+
+        # Write to a temporary file first so a crash never leaves a half-written image behind
+        resized_img.save(temp_path, format=image_format)
+        os.replace(temp_path, image_path)
         print(f'Successfully resized image {image_path}')
     except Exception as e:
         print(f'Failed to resize image {image_path}: {e}')
+    finally:
+        # os.replace has already moved the temporary file on success; anything left is a partial write
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
 
 def find_images(directory):
     """
@@ -50,10 +74,17 @@ def find_images(directory):
     Returns:
     generator: A generator yielding the paths to the image files.
     """
-    for foldername, subfolders, filenames in os.walk(directory):
-        for filename in filenames:
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                yield os.path.join(foldername, filename)
+    # Walk the tree with os.scandir so the extension filter runs on the directory entries
+    # returned by the kernel, without an extra stat call per file
+    folders = [directory]
+    while folders:
+        foldername = folders.pop()
+        with os.scandir(foldername) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.name[entry.name.rfind('.'):].lower() in IMAGE_EXTENSIONS:
+                    yield entry.path
 
 def resize_images(directory, new_width, new_height):
     """
@@ -67,10 +98,10 @@ def resize_images(directory, new_width, new_height):
     Returns:
     None
     """
-    images = list(find_images(directory))
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        for image in images:
-            executor.submit(resize_image, image, new_width, new_height)
+    # Stream the paths to the workers while the directory is still being walked
+    # Resampling is CPU-bound, so use processes rather than threads to use every core
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=init_worker) as executor:
+        executor.map(partial(resize_image, new_width=new_width, new_height=new_height), find_images(directory), chunksize=CHUNKSIZE)
 
 if __name__ == "__main__":
     # Get user inputs
@@ -17,7 +17,9 @@ Example:
     python script.py
 """
 
+import contextlib
 import os
+import sys
 import concurrent.futures
 from PIL import Image
 from PIL import ImageFile
@@ -28,6 +30,15 @@ Image.MAX_IMAGE_PIXELS = None
 # This line tells PIL to be forgiving of image files that are truncated.
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
+# Number of images handed to a worker process at a time
+CHUNKSIZE = 16
+
+def init_worker():
+    """
+    Load the Pillow image plugins once when a worker process starts, instead of on its first image.
+    """
+    Image.init()
+
 def rotate_image(file_path):
     """
     Rotate an image if its width is greater than its height.
@@ -36,19 +47,30 @@ def rotate_image(file_path):
     - file_path (str): The path to the image file.
 
     Returns:
-    None
+    str: A message describing the result, printed by the main process.
     """
+    # Temporary file the new image is written to before it replaces the original
+    temp_path = file_path + '.tmp'
     try:
-        image = Image.open(file_path)
-        # If width > height, rotate the image
-        if image.size[0] > image.size[1]:
-            rotated_image = image.rotate(90, expand=True)
-            rotated_image.save(file_path, format="PNG")
-            print(f"Rotated {file_path}")
-        else:
-            print(f"Skipped {file_path} (size: {image.size[0]}x{image.size[1]})")
+        # Opening only reads the header, so portrait images are skipped without decoding them
+        with Image.open(file_path) as image:
+            width, height = image.size
+            if width <= height:
+                return f"Skipped {file_path} (size: {width}x{height})"
+
+            # If width > height, rotate the image; transpose is an exact pixel shuffle
+            rotated_image = image.transpose(Image.ROTATE_90)
+
+        # Write to a temporary file first so a crash never leaves a half-written image behind
+        rotated_image.save(temp_path, format="PNG", optimize=False)
+        os.replace(temp_path, file_path)
+        return f"Rotated {file_path}"
     except IOError:
-        print(f"Failed to process {file_path}. The file might be corrupted or truncated.")
+        return f"Failed to process {file_path}. The file might be corrupted or truncated."
+    finally:
+        # os.replace has already moved the temporary file on success; anything left is a partial write
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
 
 def rotate_images(folder_path, max_workers):
     """
@@ -62,10 +84,12 @@ def rotate_images(folder_path, max_workers):
     None
     """
     files = os.listdir(folder_path)
-    png_files = [os.path.join(folder_path, file) for file in files if file.lower().endswith(".png")]
+    png_files = (os.path.join(folder_path, file) for file in files if file[file.rfind('.'):].lower() == ".png")
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        executor.map(rotate_image, png_files)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as executor:
+        # Report the results from the main process instead of printing from every worker
+        results = executor.map(rotate_image, png_files, chunksize=CHUNKSIZE)
+        sys.stdout.writelines(f"{message}\n" for message in results)
 
 if __name__ == "__main__":
     # Get user inputs
@@ -15,20 +15,29 @@ Example:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import shutil
+from urllib3.exceptions import HTTPError
 from PIL import Image
 from pathlib import Path
 from time import sleep
 from typing import Optional
 import argparse
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import concurrent.futures
+from itertools import islice
+
+from image_decode import open_for_crop
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# DuckDuckGo search client, created on first use and reused for every search term
+_ddgs = None
+
 def search_images(
     keywords: str,
     safesearch: str = "moderate",
@@ -49,56 +58,81 @@ def search_images(
     Returns:
         list: List of image search results.
     """
+    global _ddgs
     try:
-        from duckduckgo_search import DDGS
+        if _ddgs is None:
+            from duckduckgo_search import DDGS
+            _ddgs = DDGS()
+        # Stop pulling results once max_results have been collected
         return list(
-            DDGS().images(
-                keywords,
-                safesearch=safesearch,
-                size=size,
-                type_image=type_image
+            islice(
+                _ddgs.images(
+                    keywords,
+                    safesearch=safesearch,
+                    size=size,
+                    type_image=type_image
+                ),
+                max_results
             )
-        )[:max_results]
+        )
     except ImportError:
         logger.error("Failed to import the duckduckgo_search library.")
         raise
 
-def save_image(dest, image_data):
+def save_image(dest, image_stream):
     """
     Save image data to file.
 
     Parameters:
         dest (str): Destination path to save the image.
-        image_data (bytes): Image data to save.
+        image_stream (file-like): Stream of image data to save.
     """
+    # Download to a .part file and only give it the final name once the whole body has arrived,
+    # so a dropped connection never leaves a truncated image for the cropping pass to pick up
+    part_path = Path(dest).with_suffix('.part')
     try:
-        with open(dest, 'wb') as f:
-            f.write(image_data)
+        # Copy in 64 KiB chunks straight to the unbuffered file, never holding the whole image in memory
+        with open(part_path, 'wb', buffering=0) as f:
+            shutil.copyfileobj(image_stream, f, 1 << 16)
+        os.replace(part_path, dest)
     except IOError as e:
         logger.error(f"Failed to save image: {e}")
         raise
+    finally:
+        # Already moved on success; anything left is a partial download
+        part_path.unlink(missing_ok=True)
 
-def download_and_save_image(url, dest):
+def download_and_save_image(url, dest, session=None):
     """
     Download image from URL and save it to file.
 
     Parameters:
         url (str): URL of the image to download.
         dest (str): Destination path to save the image.
+        session (Optional[requests.Session]): Shared session whose connection pool is reused between downloads.
+
+    Returns:
+        bool: True if the image was saved.
     """
+    http = session if session is not None else requests
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            content_type = response.headers.get('Content-Type')
-            if content_type == 'image/jpeg' or content_type == 'image/png':
-                save_image(dest, response.content)
-                logger.info(f"Downloaded image: {dest}")
+        # Stream the body so the headers can be checked before any of it is read
+        with http.get(url, stream=True) as response:
+            if response.status_code == 200:
+                content_type = response.headers.get('Content-Type')
+                if content_type == 'image/jpeg' or content_type == 'image/png':
+                    # Undo any gzip/deflate transfer encoding while copying the raw stream
+                    response.raw.decode_content = True
+                    save_image(dest, response.raw)
+                    logger.info(f"Downloaded image: {dest}")
+                    return True
+                else:
+                    logger.warning(f"Unsupported image format: {content_type}")
             else:
-                logger.warning(f"Unsupported image format: {content_type}")
-        else:
-            logger.warning(f"Failed to download image: {response.status_code}")
-    except requests.RequestException as e:
+                logger.warning(f"Failed to download image: {response.status_code}")
+    except (requests.RequestException, HTTPError) as e:
         logger.error(f"Failed to download image: {e}")
+    return False
 
 def square_crop(image_path, dest, crop_size):
     """
@@ -110,34 +144,29 @@ def square_crop(image_path, dest, crop_size):
         crop_size (int): Size for square cropping in pixels.
     """
     try:
-        img = Image.open(image_path)
+        # Opening only parses the header, so already-processed JPEGs are skipped without decoding any pixels
+        with Image.open(image_path) as probe:
+            width, height = probe.size
+            image_format = probe.format
+        if image_format == 'JPEG' and width == height <= crop_size:
+            return
+        img = open_for_crop(image_path, crop_size)
+        # A scaled JPEG decode is smaller than the header size
         width, height = img.size
-        if width != height:
-            min_dim = min(width, height)
-            left = (width - min_dim) // 2
-            top = (height - min_dim) // 2
-            right = (width + min_dim) // 2
-            bottom = (height + min_dim) // 2
-            img = img.crop((left, top, right, bottom))
-        img.thumbnail((crop_size, crop_size))
+        min_dim = min(width, height)
+        left = (width - min_dim) // 2
+        top = (height - min_dim) // 2
+        right = (width + min_dim) // 2
+        bottom = (height + min_dim) // 2
+        # Crop and resample in a single pass; like thumbnail, never upscale past the source
+        target = min(crop_size, min_dim)
+        img = img.resize((target, target), Image.LANCZOS, box=(left, top, right, bottom), reducing_gap=3.0)
         img.save(dest)
         logger.info(f"Cropped image: {dest}")
     except IOError as e:
         logger.error(f"Failed to crop image: {e}")
         raise
 
-def download_and_crop_image(url, dest, crop_size):
-    """
-    Download image from URL, save it to file, and perform cropping.
-
-    Parameters:
-        url (str): URL of the image to download.
-        dest (str): Destination path to save the image.
-        crop_size (int): Size for square cropping in pixels.
-    """
-    download_and_save_image(url, dest)
-    square_crop(dest, dest, crop_size)
-
 def run_image_downloader():
     """
     Main function to run the image downloader program.
@@ -168,6 +197,15 @@ def run_image_downloader():
     max_workers = min(args.max_images, os.cpu_count() or 1)
     executor = ThreadPoolExecutor(max_workers=max_workers)
 
+    # Cropping is CPU bound, so it runs in separate processes instead of the download threads
+    crop_executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+    # Share one session between the threads so TCP/TLS connections are kept alive and reused
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
     # Split search terms
     search_terms = args.search_terms.split(',')
 
@@ -184,8 +222,36 @@ def run_image_downloader():
             max_results=args.max_images
         )
 
-        # Download and crop images using thread pool executor
-        download_tasks = []
+        # Download images using thread pool executor
+        download_tasks = {}
         for i, image in enumerate(photo_urls):
             url = image['image']
-            dest
+            dest = search_folder / f'photo_{i}.jpg'
+            download_tasks[executor.submit(download_and_save_image, url, dest, session)] = dest
+
+        # Hand each image to the crop processes as soon as its download finishes
+        crop_tasks = []
+        for task in concurrent.futures.as_completed(download_tasks):
+            try:
+                if task.result():
+                    dest = download_tasks[task]
+                    crop_tasks.append(crop_executor.submit(square_crop, dest, dest, args.crop_size))
+            except IOError:
+                # Already logged by save_image
+                pass
+
+        # Wait for this search term's crops before moving on
+        for task in concurrent.futures.as_completed(crop_tasks):
+            try:
+                task.result()
+            except IOError:
+                # Already logged by square_crop
+                pass
+
+    executor.shutdown()
+    crop_executor.shutdown()
+    session.close()
+    logger.info("Image download and cropping completed.")
+
+if __name__ == "__main__":
+    run_image_downloader()
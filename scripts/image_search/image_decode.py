@@ -0,0 +1,60 @@
+"""
+Image decoding shared by the image search scripts in this folder.
+
+Functionality:
+1. Opens downloaded images for square cropping at the smallest decode size that still leaves
+   at least twice the crop size for the final resample.
+2. Uses libjpeg-turbo through PyTurboJPEG for JPEGs when it is installed, and Pillow's draft mode otherwise,
+   so both paths decode to the same size.
+
+Usage:
+    Imported by the image search scripts; it is not meant to be run on its own.
+
+Example:
+    from image_decode import open_for_crop
+"""
+
+from PIL import Image
+
+# libjpeg-turbo can decode JPEGs at a reduced DCT scale; fall back to Pillow when PyTurboJPEG
+# or its shared library is not installed
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    turbo = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    turbo = None
+
+def open_for_crop(image_path, crop_size):
+    """
+    Open an image for square cropping. JPEGs are decoded at a reduced scale whose short side is
+    still at least twice the crop size, with libjpeg-turbo when PyTurboJPEG is available.
+
+    Parameters:
+        image_path (str): Path to the image file.
+        crop_size (int): Size for square cropping in pixels.
+
+    Returns:
+        PIL.Image.Image: The opened image.
+    """
+    # Leave the final resample twice the crop size to work from, on either decode path
+    min_decode_size = crop_size * 2
+    if turbo is not None and str(image_path).lower().endswith(('.jpg', '.jpeg')):
+        try:
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            width, height, _, _ = turbo.decode_header(data)
+            min_dim = min(width, height)
+            # Smallest scaling factor that keeps the short side at or above min_decode_size
+            factor = min(
+                (sf for sf in turbo.scaling_factors if min_dim * sf[0] >= min_decode_size * sf[1]),
+                key=lambda sf: sf[0] / sf[1],
+                default=(1, 1)
+            )
+            return Image.fromarray(turbo.decode(data, pixel_format=TJPF_RGB, scaling_factor=factor))
+        except OSError:
+            # Not actually a JPEG (e.g. a PNG saved as .jpg) or corrupt; let Pillow handle it
+            pass
+    img = Image.open(image_path)
+    # Let libjpeg decode at a reduced DCT scale that still covers min_decode_size; a no-op for other formats
+    img.draft('RGB', (min_decode_size, min_decode_size))
+    return img
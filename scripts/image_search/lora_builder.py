@@ -20,11 +20,18 @@ Example:
 from duckduckgo_search import DDGS
 import requests
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
 from PIL import Image
 from pathlib import Path
-from time import sleep
 from typing import Optional
 
+from image_decode import open_for_crop
+
+# DuckDuckGo search client, created on first use and reused for every search term
+_ddgs = None
+
 def search_images(
     keywords: str,
     safesearch: str = "moderate",
@@ -45,43 +52,64 @@ def search_images(
     Returns:
         list: List of image search results.
     """
+    global _ddgs
+    if _ddgs is None:
+        _ddgs = DDGS()
+    # Stop pulling results once max_results have been collected
     return list(
-        DDGS().images(
-            keywords,
-            safesearch=safesearch,
-            size=size,
-            type_image=type_image
+        islice(
+            _ddgs.images(
+                keywords,
+                safesearch=safesearch,
+                size=size,
+                type_image=type_image
+            ),
+            max_results
         )
-    )[:max_results]
+    )
 
-def save_image(dest, image_data):
+def save_image(dest, image_stream):
     """
     Save image data to file.
 
     Parameters:
         dest (str): Destination path to save the image.
-        image_data (bytes): Image data to save.
+        image_stream (file-like): Stream of image data to save.
     """
-    with open(dest, 'wb') as f:
-        f.write(image_data)
-
-def download_and_save_image(url, dest):
+    # Download to a .part file and only give it the final name once the whole body has arrived,
+    # so a dropped connection never leaves a truncated image for the cropping pass to pick up
+    part_path = Path(dest).with_suffix('.part')
+    try:
+        # Copy in 64 KiB chunks straight to the unbuffered file, never holding the whole image in memory
+        with open(part_path, 'wb', buffering=0) as f:
+            shutil.copyfileobj(image_stream, f, 1 << 16)
+        os.replace(part_path, dest)
+    finally:
+        # Already moved on success; anything left is a partial download
+        part_path.unlink(missing_ok=True)
+
+def download_and_save_image(url, dest, session=None):
     """
     Download image from URL and save it to file.
 
     Parameters:
         url (str): URL of the image to download.
         dest (str): Destination path to save the image.
+        session (Optional[requests.Session]): Shared session whose connection is reused between downloads.
     """
-    response = requests.get(url)
-    if response.status_code == 200:
-        content_type = response.headers.get('Content-Type')
-        if content_type == 'image/jpeg' or content_type == 'image/png':
-            save_image(dest, response.content)
+    http = session if session is not None else requests
+    # Stream the body so the headers can be checked before any of it is read
+    with http.get(url, stream=True) as response:
+        if response.status_code == 200:
+            content_type = response.headers.get('Content-Type')
+            if content_type == 'image/jpeg' or content_type == 'image/png':
+                # Undo any gzip/deflate transfer encoding while copying the raw stream
+                response.raw.decode_content = True
+                save_image(dest, response.raw)
+            else:
+                print(f"Unsupported image format: {content_type}")
         else:
-            print(f"Unsupported image format: {content_type}")
-    else:
-        print(f"Failed to download image: {response.status_code}")
+            print(f"Failed to download image: {response.status_code}")
 
 def square_crop(image_path, dest, crop_size):
     """
@@ -92,16 +120,23 @@ def square_crop(image_path, dest, crop_size):
         dest (str): Destination path to save the cropped image.
         crop_size (int): Size for square cropping in pixels.
     """
-    img = Image.open(image_path)
+    # Opening only parses the header, so already-processed JPEGs are skipped without decoding any pixels
+    with Image.open(image_path) as probe:
+        width, height = probe.size
+        image_format = probe.format
+    if image_format == 'JPEG' and width == height <= crop_size:
+        return
+    img = open_for_crop(image_path, crop_size)
+    # A scaled JPEG decode is smaller than the header size
     width, height = img.size
-    if width != height:
-        min_dim = min(width, height)
-        left = (width - min_dim) // 2
-        top = (height - min_dim) // 2
-        right = (width + min_dim) // 2
-        bottom = (height + min_dim) // 2
-        img = img.crop((left, top, right, bottom))
-    img.thumbnail((crop_size, crop_size))
+    min_dim = min(width, height)
+    left = (width - min_dim) // 2
+    top = (height - min_dim) // 2
+    right = (width + min_dim) // 2
+    bottom = (height + min_dim) // 2
+    # Crop and resample in a single pass; like thumbnail, never upscale past the source
+    target = min(crop_size, min_dim)
+    img = img.resize((target, target), Image.LANCZOS, box=(left, top, right, bottom), reducing_gap=3.0)
     img.save(dest)
 
 def run_image_downloader():
@@ -127,6 +162,9 @@ def run_image_downloader():
 
     crop_size = int(input("Enter the size for square cropping (in pixels): "))
 
+    # Reuse one keep-alive connection per host instead of a new handshake per image
+    session = requests.Session()
+
     for search_term in search_terms:
         search_folder = images_folder / search_term.strip()
         search_folder.mkdir(exist_ok=True)
@@ -142,14 +180,16 @@ def run_image_downloader():
 
         for i, image in enumerate(photo_urls):
             url = image['image']
-            download_and_save_image(url, search_folder / f'photo_{i}.jpg')
-            sleep(1)  # Pause between downloads
+            download_and_save_image(url, search_folder / f'photo_{i}.jpg', session)
 
-        # Crop images
-        for image_path in search_folder.glob('*.jpg'):
-            square_crop(image_path, image_path, crop_size)
+        # Crop images in parallel; the resampling is CPU bound, so use processes rather than threads
+        image_paths = list(search_folder.glob('*.jpg'))
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(square_crop, image_paths, image_paths, repeat(crop_size)))
 
+    session.close()
     print("Image download and cropping completed.")
 
 # Run the image downloader program
-run_image_downloader()
+if __name__ == "__main__":
+    run_image_downloader()
@@ -4,7 +4,8 @@ This script prepends a specified text to all text files in a given directory.
 Functionality:
 1. Checks if the specified directory exists.
 2. Iterates over all files in the directory.
-3. For each text file, reads its content, prepends the specified text, and writes the new content back to the file.
+3. For each text file, writes the specified text followed by the file's content to a temporary file and replaces the original with it.
+4. Uses a ProcessPoolExecutor to process multiple files concurrently.
 
 Usage:
     Adjust the `directory_path` and `text_to_prepend` variables to specify the target directory and the text to prepend.
@@ -16,6 +17,32 @@ Example:
 """
 
 import os
+import shutil
+import concurrent.futures
+from functools import partial
+
+# Number of files handed to a worker process at a time; each file is quick to rewrite
+CHUNKSIZE = 32
+
+def prepend_text_to_file(file_path, text_to_prepend):
+    """
+    Prepend specified text to a single text file.
+
+    Parameters:
+        file_path (str): The path to the text file.
+        text_to_prepend (str): The text to prepend to the file's content.
+
+    Returns:
+        str: Message describing the processed file.
+    """
+    temp_path = file_path + '.tmp'
+    # Write the text followed by the streamed original contents to a temporary file
+    with open(file_path, 'rb') as src, open(temp_path, 'wb') as dst:
+        dst.write(text_to_prepend.encode('utf-8'))
+        shutil.copyfileobj(src, dst, 1 << 20)
+    # Swap it in atomically so a crash never leaves a half-written file
+    os.replace(temp_path, file_path)
+    return f"Prepended text to {os.path.basename(file_path)}"
 
 def prepend_text_to_files(directory_path, text_to_prepend):
     """
@@ -30,23 +57,18 @@ def prepend_text_to_files(directory_path, text_to_prepend):
         print(f"The directory {directory_path} does not exist.")
         return
 
-    # Iterate over all files in the given directory
-    for filename in os.listdir(directory_path):
-        # Construct the full file path
-        file_path = os.path.join(directory_path, filename)
-        # Check if the current file is a text file
-        if os.path.isfile(file_path) and file_path.endswith('.txt'):
-            # Read the contents of the file
-            with open(file_path, 'r') as file:
-                content = file.read()
-            # Prepend the text to the contents
-            content = text_to_prepend + content
-            # Write the new content back to the file
-            with open(file_path, 'w') as file:
-                file.write(content)
-            print(f"Prepended text to {filename}")
+    # Collect the text files before rewriting any, so a replaced file is never listed twice;
+    # scandir reports the file type without a stat per file
+    with os.scandir(directory_path) as entries:
+        file_paths = [entry.path for entry in entries if entry.is_file(follow_symlinks=False) and entry.name.endswith('.txt')]
+
+    # Rewrite the files concurrently
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        for message in executor.map(partial(prepend_text_to_file, text_to_prepend=text_to_prepend), file_paths, chunksize=CHUNKSIZE):
+            print(message)
 
 # Usage example:
-directory_path = '/PATH/v2_token'  # Change this to your folder path
-text_to_prepend = 'Faena, '
-prepend_text_to_files(directory_path, text_to_prepend)
+if __name__ == "__main__":
+    directory_path = '/PATH/v2_token'  # Change this to your folder path
+    text_to_prepend = 'Faena, '
+    prepend_text_to_files(directory_path, text_to_prepend)
@@ -7,6 +7,7 @@ Functionality:
 3. Iterates through each text file in the directory.
 4. Reads the content of each text file, replaces all periods with commas, and writes the updated content back to the file.
 5. Logs the processing of each file.
+6. Uses a ProcessPoolExecutor to process multiple files concurrently.
 
 Usage:
     Run the script and provide the path to the directory when prompted.
@@ -16,28 +17,61 @@ Example:
 """
 
 import os
+import concurrent.futures
 
-# Ask the user to input the path to the directory
-directory = input("Please enter the path to the folder: ")
+# Number of files handed to a worker process at a time; each file is quick to rewrite
+CHUNKSIZE = 32
 
-# Check if the directory exists
-if not os.path.isdir(directory):
-    print("The specified directory does not exist. Please check the path and try again.")
-else:
-    # Iterate through each file in the directory
-    for filename in os.listdir(directory):
-        if filename.endswith(".txt"):  # Check if the file is a .txt file
-            file_path = os.path.join(directory, filename)  # Create the full file path
-            with open(file_path, 'r') as file:
-                content = file.read()
+# Byte translation table mapping '.' to ','; safe on UTF-8 since 0x2E never occurs inside a multibyte character
+PERIOD_TO_COMMA = bytes.maketrans(b'.', b',')
 
-            # Replace all periods with commas
-            updated_content = content.replace('.', ',')
+def replace_periods(file_path):
+    """
+    Replace all periods with commas in a text file.
 
-            # Write the updated content back to the file
-            with open(file_path, 'w') as file:
-                file.write(updated_content)
+    Parameters:
+        file_path (str): The path to the text file.
 
-            print(f"Processed {filename}")
+    Returns:
+        str: Message describing the processed file.
+    """
+    # Work on raw bytes to skip decoding and re-encoding the text
+    with open(file_path, 'rb') as file:
+        content = file.read()
+
+    # Replace all periods with commas
+    updated_content = content.translate(PERIOD_TO_COMMA)
+
+    # Write the updated content back to the file
+    with open(file_path, 'wb') as file:
+        file.write(updated_content)
+
+    return f"Processed {os.path.basename(file_path)}"
+
+def main(directory):
+    """
+    Replace periods with commas in every text file of a directory.
+
+    Parameters:
+        directory (str): The path to the directory containing the text files.
+    """
+    # Check if the directory exists
+    if not os.path.isdir(directory):
+        print("The specified directory does not exist. Please check the path and try again.")
+        return
+
+    # Collect each .txt file in the directory; scandir reports the file type without a stat per file
+    with os.scandir(directory) as entries:
+        file_paths = [entry.path for entry in entries if entry.is_file(follow_symlinks=False) and entry.name.endswith(".txt")]
+
+    # Process the files concurrently
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        for message in executor.map(replace_periods, file_paths, chunksize=CHUNKSIZE):
+            print(message)
 
     print("All files have been processed.")
+
+if __name__ == "__main__":
+    # Ask the user to input the path to the directory
+    directory = input("Please enter the path to the folder: ")
+    main(directory)
@@ -9,6 +9,7 @@ Functionality:
 4. For files with double underscores in their names and specific extensions (.png, .txt, .npz), 
    it renames them by replacing the double underscores with a single underscore.
 5. Logs the renaming of each relevant file.
+6. Renames independent files from a thread pool; renames that depend on each other run in order afterwards.
 
 Usage:
     Run the script and provide the path to the directory when prompted.
@@ -18,6 +19,31 @@ Example:
 """
 
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Renames are metadata-only syscalls, so a handful of threads is enough to overlap their latency
+MAX_WORKERS = 16
+
+def rename_file(directory, filename):
+    """
+    Replace double underscores with a single underscore in a file name.
+
+    Parameters:
+        directory (str): The directory containing the file.
+        filename (str): The name of the file to rename.
+
+    Returns:
+        str: Message describing the rename.
+    """
+    new_filename = filename.replace('__', '_')
+    old_file_path = os.path.join(directory, filename)
+    new_file_path = os.path.join(directory, new_filename)
+
+    # Rename the file
+    os.rename(old_file_path, new_file_path)
+    return f"Renamed {filename} to {new_filename}"
 
 # Ask the user to input the path to the directory
 directory = input("Please enter the path to the folder: ")
@@ -26,16 +52,33 @@ directory = input("Please enter the path to the folder: ")
 if not os.path.isdir(directory):
     print("The specified directory does not exist. Please check the path and try again.")
 else:
-    # Iterate through each file in the directory
-    for filename in os.listdir(directory):
-        # Check if the file has a double underscore and is one of the specified file types
-        if '__' in filename and filename.endswith(('.png', '.txt', '.npz')):
-            new_filename = filename.replace('__', '_')
-            old_file_path = os.path.join(directory, filename)
-            new_file_path = os.path.join(directory, new_filename)
-
-            # Rename the file
-            os.rename(old_file_path, new_file_path)
-            print(f"Renamed {filename} to {new_filename}")
+    # Collect files with a double underscore and one of the specified file types up front, so renamed
+    # files cannot show up again mid-scan; scandir reports the file type without a stat per file
+    with os.scandir(directory) as entries:
+        filenames = [
+            entry.name for entry in entries
+            if entry.is_file(follow_symlinks=False)
+            and '__' in entry.name and entry.name.endswith(('.png', '.txt', '.npz'))
+        ]
+
+    # A rename onto another matched file's name, or onto a name shared with another rename, depends on
+    # ordering, so only the remaining independent renames are run concurrently
+    sources = set(filenames)
+    targets = Counter(filename.replace('__', '_') for filename in filenames)
+    independent = []
+    dependent = []
+    for filename in filenames:
+        new_filename = filename.replace('__', '_')
+        if new_filename in sources or targets[new_filename] > 1:
+            dependent.append(filename)
+        else:
+            independent.append(filename)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for message in executor.map(partial(rename_file, directory), independent):
+            print(message)
+
+    for filename in dependent:
+        print(rename_file(directory, filename))
 
     print("All relevant files have been renamed.")
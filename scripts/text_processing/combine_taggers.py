@@ -28,13 +28,13 @@ def process_files(filenames):
         filenames (list): List of file paths to be processed.
     """
     common_name = os.path.commonprefix(filenames)
-    with open(common_name + '.txt', 'w') as outfile:
+    # Concatenate verbatim in binary mode: one read and one write per file, no decoding
+    with open(common_name + '.txt', 'wb') as outfile:
         for i, fname in enumerate(filenames):
-            with open(fname) as infile:
-                for line in infile:
-                    outfile.write(line)
+            with open(fname, 'rb') as infile:
+                outfile.write(infile.read())
                 if i != len(filenames) - 1:  # If it's not the last file, add two newlines
-                    outfile.write('\n\n')
+                    outfile.write(b'\n\n')
             os.remove(fname)  # Remove the original file
 
 def main(folder_path):
@@ -53,9 +53,9 @@ def main(folder_path):
         prefix = txt_file.rsplit("GIT", 1)[0].rsplit("blip", 1)[0].rsplit("WD", 1)[0]
         groups.setdefault(prefix, []).append(txt_file)
 
-    # Process each group of files concurrently
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        executor.map(process_files, groups.values())
+    # Process each group of files in parallel across all cores; chunksize batches groups per worker round trip
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(process_files, groups.values(), chunksize=8))
 
 if __name__ == "__main__":
     folder_path = input("Enter the folder path: ")
@@ -7,6 +7,7 @@ Functionality:
 1. Prompts the user to specify the path to the folder where the search should begin.
 2. Recursively searches for image files with '.jpg' or '.png' extensions in the specified folder and its subfolders.
 3. For each image file found, creates a text file with the same name and writes a placeholder text into it.
+4. Writes the text files from a thread pool so many small writes are in flight at once.
 
 Usage:
     Replace 'your_folder_path_here' with the actual folder path you want to process.
@@ -16,6 +17,33 @@ Example:
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Image extensions to create text files for, matched case-insensitively
+IMAGE_EXTENSIONS = frozenset(('.jpg', '.png'))
+
+# Writer threads; each write is tiny, so latency (e.g. on network filesystems) dominates, not CPU
+MAX_WORKERS = 32
+
+def write_text_file(txt_file_path, data):
+    """
+    Write bytes to a file through a raw file descriptor.
+
+    Parameters:
+    - txt_file_path (str): The path of the text file to create.
+    - data (bytes): The content to write.
+
+    Returns:
+    None
+    """
+    fd = os.open(txt_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        # os.write may write only part of the buffer, so keep going until every byte is written
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 def create_text_files_for_images(folder_path):
     """
@@ -28,13 +56,22 @@ def create_text_files_for_images(folder_path):
     Returns:
     None
     """
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.lower().endswith(('.jpg', '.png')):
-                full_path = os.path.join(root, file)
-                txt_file_path = full_path.rsplit('.', 1)[0] + '.txt'
-                with open(txt_file_path, 'w') as txt_file:
-                    txt_file.write(f"This is a placeholder for {file}.")
+    # Walk the tree with an explicit stack of folders; scandir reports file types without a stat per file
+    txt_file_paths = []
+    payloads = []
+    folders = [folder_path]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.name[entry.name.rfind('.'):].lower() in IMAGE_EXTENSIONS:
+                    txt_file_paths.append(entry.path.rsplit('.', 1)[0] + '.txt')
+                    payloads.append(f"This is a placeholder for {entry.name}.".encode('utf-8'))
+
+    # Create the text files concurrently
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(write_text_file, txt_file_paths, payloads))
 
 # Example usage:
 # Replace 'your_folder_path_here' with the actual folder path you want to process.
@@ -27,8 +27,12 @@ def create_text_files_for_images(folder_path):
     Returns:
     None
     """
-    # Get all PNG and JPG files
-    image_files = [f for f in os.listdir(folder_path) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    # Get all PNG and JPG files; scandir reports the file type without a stat per file
+    with os.scandir(folder_path) as entries:
+        image_files = [
+            entry.name for entry in entries
+            if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(('.png', '.jpg', '.jpeg'))
+        ]
 
     # Create a text file for each image
     for image_file in image_files:
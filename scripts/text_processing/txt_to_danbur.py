@@ -32,6 +32,8 @@ def process_and_save_descriptions(file_path):
     with open(file_path, 'r') as file:
         lines = file.readlines()
 
+    # Work out every output path and encoded caption before touching the output directory
+    captions = []
     for line in lines:
         # Skipping empty lines
         if line.strip():
@@ -41,11 +43,19 @@ def process_and_save_descriptions(file_path):
 
             # Corrected path for the new text file
             new_text_file_path = os.path.join('/PATH/', text_file_name)
+            captions.append((new_text_file_path, caption.encode('utf-8')))
+
+    # Write each caption through a raw file descriptor, skipping the text file object per caption
+    for new_text_file_path, caption_bytes in captions:
+        fd = os.open(new_text_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            # os.write may write only part of the buffer, so keep going until every byte is written
+            view = memoryview(caption_bytes)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
 
-            # Write the caption to the corresponding text file
-            with open(new_text_file_path, 'w') as text_file:
-                text_file.write(caption)
-    
     return "Processing complete. Descriptions saved as text files."
 
 if __name__ == "__main__":
@@ -17,6 +17,8 @@ Example:
     python script.py
 """
 
+import mmap
+import os
 import re
 
 def create_text_files_from_multiline_descriptions(file_path, output_path):
@@ -30,34 +32,40 @@ def create_text_files_from_multiline_descriptions(file_path, output_path):
     Returns:
     None
     """
-    # This pattern matches the image file names at the start of a line and captures the number
-    pattern = re.compile(r"(\d+)\.jpg")
+    # This pattern matches an image file name at the start of a line, capturing the number and
+    # everything up to the next image file name (or the end of the file) as its description
+    pattern = re.compile(rb"^(\d+)\.jpg(.*?)(?=^\d+\.jpg|\Z)", re.MULTILINE | re.DOTALL)
     
     # Initialize a dictionary to store the descriptions
     descriptions = {}
     
-    # Read the file
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-    
-    # Process each line
-    for line in lines:
-        # Check if the line matches the image file pattern
-        match = pattern.match(line)
-        if match:
-            # Start a new entry in the dictionary
-            file_number = match.group(1)
-            descriptions[file_number] = line[len(match.group(0)):].strip() + "\n"
-        else:
-            # If it's not a new file name, it's part of the previous file's description
-            descriptions[file_number] += line.strip() + "\n"
+    # Memory-map the file and run the regex over the mapped bytes, so the file is never copied into Python objects
+    with open(file_path, 'rb') as file:
+        # An empty file cannot be mapped and has no descriptions
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # The file is scanned front to back once, so ask the kernel for aggressive readahead
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+                # Find every file entry in a single regex pass, decoding only the matched text
+                for match in pattern.finditer(mapped):
+                    # Keep one stripped line per description line; an entry with nothing after it is a single empty line
+                    lines = match.group(2).decode('utf-8').splitlines() or ['']
+                    descriptions[match.group(1).decode('ascii')] = "".join(line.strip() + "\n" for line in lines)
     
-    # Write the descriptions to their respective new files
+    # Write the descriptions to their respective new files through raw file descriptors
     for file_number, description in descriptions.items():
         new_file_name = f"{output_path}/{file_number}.txt"
-        with open(new_file_name, 'w') as new_file:
-            new_file.write(description)
-            print(f"Created file: {new_file_name}")
+        fd = os.open(new_file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            # os.write may write only part of the buffer, so keep going until every byte is written
+            view = memoryview(description.encode('utf-8'))
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        print(f"Created file: {new_file_name}")
 
 if __name__ == "__main__":
     # Set the file path for V3.txt and the output path
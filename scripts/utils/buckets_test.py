@@ -1,32 +1,68 @@
 """
 This script resizes and fits images to predefined target resolutions, then saves them in a specified directory.
-It also checks for duplicate images using MD5 hash comparison and logs the processing details.
+It also checks for duplicate images using content hash (BLAKE3, or MD5 as a fallback) comparison and logs the processing details.
 
 Functionality:
 1. Defines a set of target resolutions.
 2. Finds the closest target resolution for each image based on its aspect ratio.
-3. Resizes and crops the image to fit the target resolution.
+3. Resizes and centre-crops the image to fit the target resolution.
 4. Saves the processed images with a specified JPEG quality.
-5. Detects and logs duplicate images based on MD5 hash comparison.
+   When pyvips is installed, decode, resize and encode run as one libvips pipeline instead of through Pillow.
+5. Detects and logs duplicate images based on content hash comparison, skipping duplicate sources before processing.
 
 Usage:
     Adjust the command-line arguments to specify the input directory, output directory, and JPEG quality.
 
 Example:
-    python script.py --input_dir /path/to/input --output_dir /path/to/output --jpeg_quality 90
+    python script.py --input_dir /path/to/input --output_dir /path/to/output --jpeg_quality 95
 """
 
 import argparse
+import bisect
+import contextlib
 import math
 import logging
 import os
+import io
+import queue
+import threading
 import concurrent.futures
+from functools import partial
 from pathlib import Path
 from PIL import Image
-from hashlib import md5
+
+# BLAKE3 fingerprints files several times faster than MD5; fall back to MD5 when it is not installed
+try:
+    from blake3 import blake3 as content_hash
+except ImportError:
+    from hashlib import md5 as content_hash
+
+# libvips fuses shrink-on-load, resize and encode without materialising full-size buffers; it is optional
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# pyvips forwards libvips' per-image INFO messages through logging; only pass on its warnings and errors
+logging.getLogger('pyvips').setLevel(logging.WARNING)
+
+# Input file extensions to process, matched case-insensitively
+IMAGE_EXTENSIONS = frozenset(('.jpg', '.jpeg', '.png', '.webp', '.bmp'))
+
+# Modes resized before they are converted to RGB; others (palette, bilevel, 16-bit, ...) are converted first.
+# RGBA and LA are converted first too: Pillow resizes them premultiplied, which would turn fully transparent
+# pixels black instead of keeping their stored colour once alpha is dropped
+RESAMPLE_MODES = frozenset(('RGB', 'L', 'CMYK', 'YCbCr'))
+
+# Resampling filters selectable with --resample; bicubic is close to Lanczos in quality at a fraction of the cost
+RESAMPLE_FILTERS = {
+    'nearest': Image.NEAREST,
+    'bilinear': Image.BILINEAR,
+    'bicubic': Image.BICUBIC,
+    'lanczos': Image.LANCZOS,
+}
 
 def get_target_resolutions():
     """
@@ -38,94 +74,207 @@ def get_target_resolutions():
         (1152, 896), (1216, 832), (1344, 768), (1472, 704), (1632, 640)
     ]
 
-def find_closest_resolution(width, height, resolutions):
+def find_closest_resolution(width, height, resolutions, ratios):
     """
     Find the closest resolution based on aspect ratio.
 
     Parameters:
         width (int): Width of the original image.
         height (int): Height of the original image.
-        resolutions (list): List of target resolutions.
+        resolutions (list): List of target resolutions, sorted by aspect ratio.
+        ratios (list): Aspect ratio of each target resolution, in the same order.
 
     Returns:
         tuple: The closest resolution (width, height).
     """
-    min_diff = float('inf')
-    selected_res = None
     aspect_ratio = width / height
-    for res in resolutions:
-        res_aspect_ratio = res[0] / res[1]
-        aspect_diff = abs(aspect_ratio - res_aspect_ratio)
-        if aspect_diff < min_diff:
-            min_diff = aspect_diff
-            selected_res = res
-    return selected_res
+    # Binary search for the neighbouring ratios; on a tie keep the lower one
+    index = bisect.bisect_left(ratios, aspect_ratio)
+    if index == len(ratios) or (index > 0 and aspect_ratio - ratios[index - 1] <= ratios[index] - aspect_ratio):
+        index -= 1
+    return resolutions[index]
 
-def resize_and_fit_to_bucket(image, target_resolution):
+def resize_and_fit_to_bucket(image, target_resolution, resample=Image.BICUBIC):
     """
     Resize and fit the image to the target resolution.
 
     Parameters:
         image (PIL.Image.Image): The original image.
         target_resolution (tuple): The target resolution (width, height).
+        resample (int): Resampling filter for the resize.
 
     Returns:
         PIL.Image.Image: The resized and cropped image.
     """
     target_width, target_height = target_resolution
-    image_ratio = image.width / image.height
-    target_ratio = target_width / target_height
-    if image_ratio > target_ratio:
-        scale_height = int(image.height * target_width / image.width)
-        resized_image = image.resize((target_width, scale_height), Image.LANCZOS)
+    # Largest centred window with the target aspect ratio, like ImageOps.fit
+    if image.width * target_height > image.height * target_width:
+        box_width = image.height * target_width / target_height
+        left = (image.width - box_width) / 2
+        box = (left, 0, left + box_width, image.height)
     else:
-        scale_width = int(image.width * target_height / image.height)
-        resized_image = image.resize((scale_width, target_height), Image.LANCZOS)
-    return resized_image.crop((0, 0, target_width, target_height))
+        box_height = image.width * target_height / target_width
+        top = (image.height - box_height) / 2
+        box = (0, top, image.width, top + box_height)
+    # Crop and resample in a single pass; reducing_gap first shrinks large sources by an integer
+    # factor with a box filter, then resamples the rest
+    return image.resize((target_width, target_height), resample, box=box, reducing_gap=2.0)
 
-def calculate_md5(image_path):
+def calculate_hash(image_path):
     """
-    Calculate the MD5 hash of an image file.
+    Calculate the content hash of an image file.
 
     Parameters:
         image_path (str): Path to the image file.
 
     Returns:
-        str: The MD5 hash of the image.
+        str: The hex digest of the image.
+    """
+    with open(image_path, "rb", buffering=0) as f:
+        hasher = content_hash()
+        # Read in 1 MiB chunks so each read spans whole readahead windows; the file object adds no buffering of its own
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+def try_calculate_hash(image_path):
     """
-    hash_md5 = md5()
-    with open(image_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+    Calculate the content hash of an image file, or None if it cannot be read.
+
+    Parameters:
+        image_path (str): Path to the image file.
+
+    Returns:
+        str: The hex digest of the image, or None if reading it failed.
+    """
+    try:
+        return calculate_hash(image_path)
+    except OSError:
+        return None
+
+def drop_duplicate_sources(image_paths):
+    """
+    Hash the source images and keep only the first image for each distinct content.
+
+    Parameters:
+        image_paths (list): Paths to the source images.
+
+    Returns:
+        tuple: The unique image paths, and a list of (duplicate path, original path) pairs.
+    """
+    # Hashing is I/O bound, so threads overlap the reads; reading the files now also warms the
+    # page cache for the decode that follows
+    unique_sources = {}
+    unique_paths = []
+    duplicates = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for image_path, file_hash in zip(image_paths, executor.map(try_calculate_hash, image_paths)):
+            if file_hash is None:
+                # Unreadable or vanished; pass it on so processing reports it like any other failed image
+                unique_paths.append(image_path)
+            elif file_hash in unique_sources:
+                duplicates.append((image_path, unique_sources[file_hash]))
+                logging.info(f"Skipping duplicate source: {image_path} is a duplicate of {unique_sources[file_hash]}")
+            else:
+                unique_sources[file_hash] = image_path
+                unique_paths.append(image_path)
+    return unique_paths, duplicates
 
-def process_image(image_path, output_dir, resolutions, jpeg_quality):
+def encode_with_vips(image_path, target_resolution, jpeg_quality):
     """
-    Process an image: resize, crop, and save it.
+    Resize, crop and JPEG-encode an image to the target resolution with libvips.
+
+    Parameters:
+        image_path (str): Path to the input image.
+        target_resolution (tuple): The target resolution (width, height).
+        jpeg_quality (int): JPEG quality for saving the image.
+
+    Returns:
+        bytes: The encoded JPEG.
+    """
+    target_width, target_height = target_resolution
+    # Scale to cover the bucket and crop the centre, like resize_and_fit_to_bucket;
+    # EXIF orientation is left alone to match the Pillow path
+    image = pyvips.Image.thumbnail(str(image_path), target_width, height=target_height, crop='centre', no_rotate=True)
+    # Drop alpha the way Pillow's convert('RGB') does, then make sure the result is 3-band sRGB
+    if image.hasalpha():
+        image = image.extract_band(0, n=image.bands - 1)
+    image = image.colourspace('srgb')
+    # Write no EXIF, XMP or ICC data, like the Pillow path; a kept Orientation tag would make loaders that apply it
+    # rotate the bucket image. libvips 8.15 replaced strip with keep
+    if pyvips.at_least_libvips(8, 15):
+        strip_options = {'keep': 'none'}
+    else:
+        strip_options = {'strip': True}
+    return image.jpegsave_buffer(Q=jpeg_quality, optimize_coding=True, subsample_mode='on', interlace=False, **strip_options)
+
+def process_image(image_path, output_dir, resolutions, ratios, jpeg_quality, resample=Image.BICUBIC):
+    """
+    Process an image: resize, crop, and encode it in memory, hashing the encoded bytes.
 
     Parameters:
         image_path (str): Path to the input image.
         output_dir (str): Directory to save the processed image.
-        resolutions (list): List of target resolutions.
+        resolutions (list): List of target resolutions, sorted by aspect ratio.
+        ratios (list): Aspect ratio of each target resolution, in the same order.
         jpeg_quality (int): JPEG quality for saving the image.
+        resample (int): Resampling filter for the resize.
 
     Returns:
-        Path: Path to the processed image or None if processing failed.
+        tuple: Output path, encoded JPEG bytes and their content hash, or (None, None, None) if processing failed.
     """
     try:
         with Image.open(image_path) as image:
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            closest_res = find_closest_resolution(image.width, image.height, resolutions)
-            processed_image = resize_and_fit_to_bucket(image, closest_res)
+            # The bucket only depends on the header size, so pick it before decoding; then let libjpeg
+            # decode at the smallest DCT scale that is still at least twice the bucket size
+            closest_res = find_closest_resolution(image.width, image.height, resolutions, ratios)
             output_path = output_dir / f"{image_path.stem}_{closest_res[0]}x{closest_res[1]}.jpg"
-            processed_image.save(output_path, 'JPEG', quality=jpeg_quality)
-            return output_path
+            # Encode in memory; the parent checks the hash and hands the bytes to the writer thread
+            if pyvips is not None:
+                data = encode_with_vips(image_path, closest_res, jpeg_quality)
+            else:
+                image.draft('RGB', (closest_res[0] * 2, closest_res[1] * 2))
+                if image.mode not in RESAMPLE_MODES:
+                    image = image.convert('RGB')
+                processed_image = resize_and_fit_to_bucket(image, closest_res, resample)
+                # Converting after the resize only touches bucket-sized pixels
+                if processed_image.mode != 'RGB':
+                    processed_image = processed_image.convert('RGB')
+                buffer = io.BytesIO()
+                # Optimised Huffman tables and 4:2:0 chroma subsampling, baseline rather than progressive
+                processed_image.save(buffer, 'JPEG', quality=jpeg_quality, optimize=True, subsampling=2, progressive=False)
+                data = buffer.getvalue()
+            return output_path, data, content_hash(data).hexdigest()
     except Exception as e:
         logging.error(f"Error processing {image_path}: {e}")
-        return None
+        return None, None, None
+
+def write_outputs(write_queue):
+    """
+    Write queued images to disk until a None sentinel is received.
 
-def main(input_dir, output_dir, jpeg_quality):
+    Parameters:
+        write_queue (queue.Queue): Queue of (output path, encoded bytes) pairs.
+    """
+    while True:
+        item = write_queue.get()
+        if item is None:
+            break
+        output_path, data = item
+        # Write to a temporary file and rename it into place, so an interrupted run never leaves a truncated image
+        temp_path = output_path.with_name(output_path.name + '.tmp')
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, output_path)
+        except Exception as e:
+            # Keep draining the queue whatever went wrong; if this thread died, the producer would block
+            # forever on the full queue
+            logging.error(f"Error writing {output_path}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+
+def main(input_dir, output_dir, jpeg_quality, resample=Image.BICUBIC):
     """
     Main function to process all images in the input directory.
 
@@ -133,28 +282,49 @@ def main(input_dir, output_dir, jpeg_quality):
         input_dir (str): Directory containing input images.
         output_dir (str): Directory where output images will be saved.
         jpeg_quality (int): JPEG quality for saving images.
+        resample (int): Resampling filter for resizing images.
     """
     resolutions = get_target_resolutions()
+    # Aspect ratios are computed once here rather than for every image
+    ratios = [width / height for width, height in resolutions]
     input_dir = Path(input_dir)
     output_dir = Path(output_dir)
     if not output_dir.exists():
         output_dir.mkdir(parents=True, exist_ok=True)
 
     checksums = {}
-    duplicates = []
-    image_paths = list(input_dir.glob('*.*'))
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {executor.submit(process_image, path, output_dir, resolutions, jpeg_quality): path for path in image_paths}
-        for future in concurrent.futures.as_completed(futures):
-            image_path = futures[future]
-            result_path = future.result()
-            if result_path:
-                md5_hash = calculate_md5(result_path)
-                if md5_hash in checksums:
-                    duplicates.append((result_path, checksums[md5_hash]))
-                    logging.info(f"Duplicate found: {result_path} is a duplicate of {checksums[md5_hash]}")
-                else:
-                    checksums[md5_hash] = result_path
+    # List the input folder in one pass and keep only image files; scandir reports file types without a stat per file
+    with os.scandir(input_dir) as entries:
+        image_paths = [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name[entry.name.rfind('.'):].lower() in IMAGE_EXTENSIONS
+        ]
+    unique_paths, duplicates = drop_duplicate_sources(image_paths)
+
+    # A single writer thread flushes finished images so the workers can move straight on to the next one;
+    # the queue is bounded so encoded images cannot pile up in memory when the output disk is slow
+    num_workers = os.cpu_count() or 1
+    write_queue = queue.Queue(maxsize=2 * num_workers)
+    writer = threading.Thread(target=write_outputs, args=(write_queue,))
+    writer.start()
+
+    try:
+        # Decode, resize and encode are CPU bound, so spread them over one process per core;
+        # chunksize batches several images per round trip to a worker
+        with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+            worker = partial(process_image, output_dir=output_dir, resolutions=resolutions, ratios=ratios, jpeg_quality=jpeg_quality, resample=resample)
+            for result_path, data, file_hash in executor.map(worker, unique_paths, chunksize=8):
+                if result_path:
+                    if file_hash in checksums:
+                        # Duplicates are detected before writing, so they never reach the disk
+                        duplicates.append((result_path, checksums[file_hash]))
+                        logging.info(f"Duplicate found: {result_path} is a duplicate of {checksums[file_hash]}, not saved")
+                    else:
+                        checksums[file_hash] = result_path
+                        write_queue.put((result_path, data))
+    finally:
+        write_queue.put(None)
+        writer.join()
 
     logging.info(f"Processed images: {len(image_paths) - len(duplicates)}")
     logging.info(f"Duplicate images found: {len(duplicates)}")
@@ -164,6 +334,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Resize and fit images to predefined resolutions.")
     parser.add_argument("--input_dir", type=str, required=True, help="Directory containing input images.")
     parser.add_argument("--output_dir", type=str, required=True, help="Directory where output images will be saved.")
-    parser.add_argument("--jpeg_quality", type=int, default=100, help="JPEG quality for saving images.")
+    parser.add_argument(
+        "--jpeg_quality", type=int, default=95,
+        help="JPEG quality for saving images (default 95). Images are saved with 4:2:0 chroma subsampling and optimised "
+             "Huffman tables; 100 makes files several times larger for no visible gain in training data, while values "
+             "below about 90 start to show compression artefacts."
+    )
+    parser.add_argument("--resample", choices=list(RESAMPLE_FILTERS), default='bicubic', help="Resampling filter for resizing. Large downscales are first reduced with a cheap box filter to twice the target size. Ignored when pyvips is installed, which uses its own shrink-on-load and Lanczos pipeline.")
     args = parser.parse_args()
-    main(args.input_dir, args.output_dir, args.jpeg_quality)
+    main(args.input_dir, args.output_dir, args.jpeg_quality, RESAMPLE_FILTERS[args.resample])
@@ -1,14 +1,14 @@
 """
 This script resizes and crops images based on generated bucket resolutions, converts them to sRGB color space if necessary,
-saves them in a specified format, and finds duplicate images based on their MD5 hash.
+saves them in a specified format, and finds duplicate images based on their content hash (BLAKE3, or MD5 as a fallback).
 
 Functionality:
 1. Generates bucket resolutions based on specified constraints.
 2. Converts images to sRGB color space if they contain an ICC profile.
 3. Resizes and crops images to fit into the closest bucket resolution.
 4. Saves the processed images in the specified output format.
-5. Uses concurrent processing to speed up image processing.
-6. Finds and logs duplicate images based on their MD5 hash.
+5. Uses a process pool to spread image processing across all CPU cores.
+6. Skips duplicate source images before processing, and finds and logs duplicate output images based on their content hash.
 
 Usage:
     Run the script with the necessary command-line arguments to specify input and output directories,
@@ -19,21 +19,46 @@ Example:
 """
 
 import argparse
-import math
+import hashlib
 import logging
 import os
 import io
+import mmap
 import concurrent.futures
+from functools import lru_cache, partial
 from pathlib import Path
 from PIL import Image, ImageCms
-from hashlib import md5
+
+# BLAKE3 fingerprints files several times faster than MD5; fall back to MD5 when it is not installed
+try:
+    from blake3 import blake3 as content_hash
+except ImportError:
+    from hashlib import md5 as content_hash
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Input file extensions to process, matched case-insensitively
+IMAGE_EXTENSIONS = frozenset(('.png', '.jpg', '.jpeg'))
+
+# Modes resized before any conversion; others (palette, bilevel, 16-bit, ...) are converted to RGB first.
+# LA is converted first: Pillow resizes it premultiplied, which would turn fully transparent pixels black
+# instead of keeping their stored colour once alpha is dropped. RGBA keeps its alpha unless it has an ICC profile
+RESAMPLE_MODES = frozenset(('RGB', 'RGBA', 'L', 'CMYK', 'YCbCr'))
+
+# Resampling filters selectable with --resample; bicubic is close to Lanczos in quality at a fraction of the cost
+RESAMPLE_FILTERS = {
+    'nearest': Image.NEAREST,
+    'bilinear': Image.BILINEAR,
+    'bicubic': Image.BICUBIC,
+    'lanczos': Image.LANCZOS,
+}
+
+@lru_cache(maxsize=None)
 def make_bucket_resolutions(max_sqrt_area=1024, min_size=512, max_size=2048, divisible_by=64):
     """
     Generate bucket resolutions based on specified constraints.
+    Results are cached per set of constraints and returned as an immutable, sorted tuple.
     """
     resolutions = set()
     max_sqrt_area //= divisible_by
@@ -49,9 +74,7 @@ def make_bucket_resolutions(max_sqrt_area=1024, min_size=512, max_size=2048, div
         resolutions.add((height / width, height, width))
         size += divisible_by
 
-    resolutions = list(resolutions)
-    resolutions.sort()
-    return resolutions
+    return tuple(sorted(resolutions))
 
 def load_profile(profile_name):
     """
@@ -63,16 +86,27 @@ def load_profile(profile_name):
         logging.error(f"Failed to load the {profile_name} profile.")
         return None
 
+# sRGB output profile, built once rather than for every image
+SRGB_PROFILE = load_profile("sRGB")
+
+# Transforms from embedded ICC profiles to sRGB, keyed by (profile digest, image mode); batches from the same
+# camera or export usually share one profile, so the transform is built once and reused
+_srgb_transforms = {}
+
 def convert_to_srgb(image):
     """
     Convert the given image to sRGB color space if necessary.
     """
     if 'icc_profile' in image.info:
         try:
-            input_profile = ImageCms.ImageCmsProfile(io.BytesIO(image.info['icc_profile']))
-            srgb_profile = load_profile("sRGB")
-            if srgb_profile:
-                return ImageCms.profileToProfile(image, input_profile, srgb_profile, outputMode='RGB')
+            if SRGB_PROFILE:
+                key = (hashlib.sha1(image.info['icc_profile']).digest(), image.mode)
+                transform = _srgb_transforms.get(key)
+                if transform is None:
+                    input_profile = ImageCms.ImageCmsProfile(io.BytesIO(image.info['icc_profile']))
+                    transform = ImageCms.buildTransform(input_profile, SRGB_PROFILE, image.mode, 'RGB')
+                    _srgb_transforms[key] = transform
+                return ImageCms.applyTransform(image, transform)
         except ImageCms.PyCMSError as e:
             logging.error("Failed to build transform, using fallback method: " + str(e))
             # Fallback method: Convert to a basic RGB profile first
@@ -80,90 +114,157 @@ def convert_to_srgb(image):
             return image
     return image
 
-def resize_and_crop_image(image_path, output_dir, bucket_resolutions, output_format):
+def resize_and_fit_to_bucket(image, target_width, target_height, resample=Image.BICUBIC):
+    """
+    Resize and centre-crop the image to exactly fill the target dimensions.
+    """
+    # Largest centred window with the target aspect ratio, like ImageOps.fit
+    if image.width * target_height > image.height * target_width:
+        box_width = image.height * target_width / target_height
+        left = (image.width - box_width) / 2
+        box = (left, 0, left + box_width, image.height)
+    else:
+        box_height = image.width * target_height / target_width
+        top = (image.height - box_height) / 2
+        box = (0, top, image.width, top + box_height)
+    # Crop and resample in a single pass; reducing_gap first shrinks large sources by an integer
+    # factor with a box filter, then resamples the rest
+    return image.resize((target_width, target_height), resample, box=box, reducing_gap=2.0)
+
+def find_closest_bucket(width, height, bucket_resolutions):
+    """
+    Find the bucket with the closest aspect ratio that an image of the given size is large enough to fill, or None.
+    """
+    aspect_ratio = width / height
+
+    # Ties go to the first bucket in sorted order, as the buckets are sorted by (ratio, width, height)
+    closest = min(
+        (
+            (abs(bucket_aspect_ratio - aspect_ratio), bucket_aspect_ratio, bucket_width, bucket_height)
+            for bucket_aspect_ratio, bucket_width, bucket_height in bucket_resolutions
+            if width >= bucket_width and height >= bucket_height
+        ),
+        default=None
+    )
+    if closest is None:
+        return None
+    return closest[2], closest[3]
+
+def resize_and_crop_image(image_path, output_dir, bucket_resolutions, output_format, resample=Image.BICUBIC):
     """
     Resize and crop a single image based on the resolution buckets, convert it to sRGB, and save it in the specified format.
     """
     try:
         with Image.open(image_path) as image:
+            # Only the header has been read so far, so images smaller than every bucket are skipped without decoding
+            bucket = find_closest_bucket(image.width, image.height, bucket_resolutions)
+            if bucket is None:
+                return None, f"No suitable bucket for {image_path.name}"
+            target_width, target_height = bucket
+
+            # Let libjpeg decode at the smallest DCT scale that is still at least twice the bucket size
+            image.draft('RGB', (target_width * 2, target_height * 2))
+
+            if image.mode not in RESAMPLE_MODES:
+                image = image.convert('RGB')
+
+            # The sRGB transform drops alpha, and Pillow resizes RGBA premultiplied, so transforming after the resize
+            # would turn fully transparent pixels black; transform those images first, as the original code did
+            srgb_before_resize = image.mode == 'RGBA' and 'icc_profile' in image.info
+            if srgb_before_resize:
+                image = convert_to_srgb(image)
+
+            # Resize first so the mode and colour conversions only touch bucket-sized pixels;
+            # the embedded ICC profile is carried over in image.info
+            image = resize_and_fit_to_bucket(image, target_width, target_height, resample)
+
             # Convert to RGB if not already (necessary for profile conversion)
             if image.mode not in ['RGB', 'RGBA']:
                 image = image.convert('RGB')
 
             # Convert to sRGB
-            image = convert_to_srgb(image)
-
-            width, height = image.size
-            aspect_ratio = width / height
-            closest_aspect_ratio = None
-            target_width = None
-            target_height = None
-            closest_aspect_ratio_diff = float("inf")
-
-            for bucket_aspect_ratio, bucket_width, bucket_height in bucket_resolutions:
-                if width >= bucket_width and height >= bucket_height:
-                    aspect_ratio_diff = abs(bucket_aspect_ratio - aspect_ratio)
-                    if aspect_ratio_diff < closest_aspect_ratio_diff:
-                        closest_aspect_ratio_diff = aspect_ratio_diff
-                        closest_aspect_ratio = bucket_aspect_ratio
-                        target_width = bucket_width
-                        target_height = bucket_height
-
-            if closest_aspect_ratio is not None:
-                new_width, new_height = adjust_image_size(image, closest_aspect_ratio, target_width, target_height, width, height)
-                image = image.resize((new_width, new_height), Image.LANCZOS)
-                image = crop_image(image, new_width, new_height, target_width, target_height)
-                output_path = output_dir / f"{image_path.stem}.{output_format.lower()}"
-                image.save(output_path, format=output_format.upper() if output_format.lower() != 'jpg' else 'JPEG')
-                return output_path, None
-            else:
-                return None, f"No suitable bucket for {image_path.name}"
+            if not srgb_before_resize:
+                image = convert_to_srgb(image)
+            output_path = output_dir / f"{image_path.stem}.{output_format.lower()}"
+            image.save(output_path, format=output_format.upper() if output_format.lower() != 'jpg' else 'JPEG')
+            return output_path, None
     except Exception as e:
         logging.error(f"Error processing {image_path}: {e}")
         return None, str(e)
 
-def adjust_image_size(image, aspect_ratio, target_width, target_height, width, height):
+def calculate_hash(image_path):
     """
-    Adjust the size of the image to maintain the aspect ratio closest to the target.
+    Calculate the content hash of an image file.
     """
-    if aspect_ratio > width / height:
-        new_width = target_width
-        new_height = math.ceil(height * new_width / width)
-    else:
-        new_height = target_height
-        new_width = math.ceil(width * new_height / height)
-    return new_width, new_height
-
-def crop_image(image, new_width, new_height, target_width, target_height):
-    """
-    Crop the image to fit into the target dimensions.
-    """
-    if new_height > target_height:
-        top = (new_height - target_height) // 2
-        bottom = top + target_height
-        image = image.crop((0, top, new_width, bottom))
-    elif new_width > target_width:
-        left = (new_width - target_width) // 2
-        right = left + target_width
-        image = image.crop((left, 0, right, new_height))
-    return image
+    with open(image_path, "rb", buffering=0) as f:
+        try:
+            # Hash straight from a read-only mapping, so the file is never copied into a Python object
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                return content_hash(mapped).hexdigest()
+        except (ValueError, OSError):
+            # Empty files cannot be mapped and very large ones may not fit the address space;
+            # read those in 1 MiB chunks instead
+            hasher = content_hash()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+            return hasher.hexdigest()
+
+def try_calculate_hash(image_path):
+    """
+    Calculate the content hash of an image file, or None if it cannot be read.
+    """
+    try:
+        return calculate_hash(image_path)
+    except OSError:
+        return None
+
+def drop_duplicate_sources(image_paths):
+    """
+    Hash the source images and keep only the first image for each distinct content.
+    Returns the unique paths and a list of (duplicate path, original path) pairs.
+    """
+    # Hashing is I/O bound, so threads overlap the reads; reading the files now also warms the
+    # page cache for the decode that follows
+    unique_sources = {}
+    unique_paths = []
+    duplicates = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for image_path, file_hash in zip(image_paths, executor.map(try_calculate_hash, image_paths)):
+            if file_hash is None:
+                # Unreadable or vanished; pass it on so processing reports it like any other failed image
+                unique_paths.append(image_path)
+            elif file_hash in unique_sources:
+                duplicates.append((image_path, unique_sources[file_hash]))
+                logging.info(f"Skipping duplicate source: {image_path} is a duplicate of {unique_sources[file_hash]}")
+            else:
+                unique_sources[file_hash] = image_path
+                unique_paths.append(image_path)
+    return unique_paths, duplicates
+
+def hash_file(image_path):
+    """
+    Hash the content of a single file, returning (path, hex digest).
+    """
+    return image_path, calculate_hash(image_path)
 
 def find_duplicates(image_directory):
     """
-    Find duplicate images based on MD5 hash.
+    Find duplicate images based on content hash.
     """
     hashes = {}
     duplicates = []
-    for image_path in Path(image_directory).rglob('*.*'):
-        with open(image_path, 'rb') as file:
-            hash_md5 = md5(file.read()).hexdigest()
-            if hash_md5 in hashes:
-                duplicates.append((image_path, hashes[hash_md5]))
+    # Read and hash files on several threads so storage reads overlap; results are collated here in order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for image_path, file_hash in executor.map(hash_file, Path(image_directory).rglob('*.*')):
+            if file_hash in hashes:
+                duplicates.append((image_path, hashes[file_hash]))
             else:
-                hashes[hash_md5] = image_path
+                hashes[file_hash] = image_path
     return duplicates
 
-def process_images(input_dir, output_dir, bucket_resolutions, output_format):
+def process_images(input_dir, output_dir, bucket_resolutions, output_format, resample=Image.BICUBIC):
     """
     Process all images using concurrent processing.
     """
@@ -172,13 +273,20 @@ def process_images(input_dir, output_dir, bucket_resolutions, output_format):
     if not output_dir.exists():
         output_dir.mkdir(parents=True, exist_ok=True)
 
-    image_paths = [p for ext in ["*.png", "*.jpg", "*.jpeg"] for p in input_dir.glob(ext)]
+    # List the input folder in one pass and keep only image files; scandir reports file types without a stat per file
+    with os.scandir(input_dir) as entries:
+        image_paths = [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name[entry.name.rfind('.'):].lower() in IMAGE_EXTENSIONS
+        ]
+    image_paths, _ = drop_duplicate_sources(image_paths)
     results = []
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(resize_and_crop_image, path, output_dir, bucket_resolutions, output_format) for path in image_paths]
-        for future in concurrent.futures.as_completed(futures):
-            result, error = future.result()
+    # Decode, ICC transform, resize and encode are CPU bound, so spread them over one process per core;
+    # chunksize batches several images per round trip to a worker
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        worker = partial(resize_and_crop_image, output_dir=output_dir, bucket_resolutions=bucket_resolutions, output_format=output_format, resample=resample)
+        for result, error in executor.map(worker, image_paths, chunksize=8):
             if error:
                 logging.error(error)
             else:
@@ -197,12 +305,13 @@ def parse_args():
     parser.add_argument("--input_dir", type=str, help="Directory containing input images.")
     parser.add_argument("--output_dir", type=str, help="Directory where output images will be saved.")
     parser.add_argument("--output_format", type=str, default='jpg', help="Output image format.")
+    parser.add_argument("--resample", choices=list(RESAMPLE_FILTERS), default='bicubic', help="Resampling filter for resizing. Large downscales are first reduced with a cheap box filter to twice the target size.")
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
     bucket_resolutions = make_bucket_resolutions(args.max_sqrt_area, args.min_size, args.max_size, args.divisible_by)
-    processed_images = process_images(args.input_dir, args.output_dir, bucket_resolutions, args.output_format)
+    processed_images = process_images(args.input_dir, args.output_dir, bucket_resolutions, args.output_format, RESAMPLE_FILTERS[args.resample])
     duplicates = find_duplicates(args.output_dir)
     logging.info(f"Processed images: {len(processed_images)}")
     logging.info(f"Duplicate images found: {len(duplicates)}")